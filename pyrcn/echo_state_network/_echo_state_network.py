@@ -241,61 +241,135 @@ class BaseEchoStateNetwork(BaseEstimator):
 
         """
         # Input-to-reservoir weights, drawn from uniform distribution.
-        idx_co = 0
         if self.k_in == -1:
-            input_weights_init = self._random_state.rand(self.reservoir_size, n_features) * 2 - 1
+            input_weights_init = self._random_state.uniform(-1., 1., (self.reservoir_size, n_features))
         else:
-            nr_entries = np.int32(self.reservoir_size*self.k_in)
-            ij = np.zeros((2, nr_entries), dtype=int)
-            data_vec = self._random_state.rand(nr_entries) * 2 - 1
-            for en in range(self.reservoir_size):
-                per = self._random_state.permutation(n_features)[:self.k_in]
-                ij[0][idx_co:idx_co+self.k_in] = en
-                ij[1][idx_co:idx_co+self.k_in] = per
-                idx_co = idx_co + self.k_in
-            input_weights_init = scipy.sparse.csc_matrix((data_vec, ij),
+            # A node cannot be connected to more distinct features than there are, e.g. for a single input feature.
+            k_in = min(self.k_in, n_features)
+            nr_entries = np.int32(self.reservoir_size*k_in)
+            data_vec = self._random_state.uniform(-1., 1., nr_entries)
+            rows, cols = self._sample_connections(self.reservoir_size, n_features, k_in)
+            input_weights_init = scipy.sparse.csr_matrix((data_vec, (rows, cols)),
                                                          shape=(self.reservoir_size, n_features), dtype='float64')
         # Recurrent weights inside the reservoir, drawn from a standard normal distribution.
-        converged = False
-        # Recurrent weights are normalized to a unitary spectral radius if possible.
-        attempts = 50
-        while not converged and attempts > 0:
-            try:
-                if self.k_res == -1:
-                    reservoir_weights_init = self._random_state.randn(self.reservoir_size, self.reservoir_size)
-                else:
-                    idx_co = 0
-                    nr_entries = np.int32(self.reservoir_size * self.k_res)
-                    ij = np.zeros((2, nr_entries), dtype=int)
-                    data_vec = self._random_state.randn(nr_entries)
-                    for en in range(self.reservoir_size):
-                        per = self._random_state.permutation(self.reservoir_size)[:self.k_res]
-                        ij[0][idx_co:idx_co + self.k_res] = en
-                        ij[1][idx_co:idx_co + self.k_res] = per
-                        idx_co += self.k_res
-
-                    reservoir_weights_init = scipy.sparse.csc_matrix((data_vec, ij),
-                                                                     shape=(self.reservoir_size, self.reservoir_size),
-                                                                     dtype='float64')
-                we = eigens(reservoir_weights_init, return_eigenvectors=False, k=6)
-                converged = True
-            except ArpackNoConvergence:
-                print("WARNING: No convergence! Redo {0} times...".format(attempts-1))
-                attempts = attempts - 1
-                if attempts == 0:
-                    print("WARNING: Returning possibly invalid eigenvalues...")
-                we = ArpackNoConvergence.eigenvalues
-                pass
-
-        reservoir_weights_init *= (1. / np.amax(np.absolute(we)))
+        # Without recurrent connections (spectral_radius == 0), they do not contribute to the reservoir states. Thus,
+        # neither the weights nor their eigenvalues are computed.
+        if self.spectral_radius == 0.:
+            reservoir_weights_init = None
+        else:
+            reservoir_weights_init = self._init_reservoir_weights()
         # Bias weights, fully connected bias for the reservoir nodes, drawn from uniform distribution.
         if self.ext_bias > 0:
-            bias_weights_init = (self._random_state.rand(self.reservoir_size, self.ext_bias) * 2 - 1)
+            bias_weights_init = self._random_state.uniform(-1., 1., (self.reservoir_size, self.ext_bias))
         else:
-            bias_weights_init = (self._random_state.rand(self.reservoir_size) * 2 - 1)
+            bias_weights_init = self._random_state.uniform(-1., 1., self.reservoir_size)
         output_weights_init = None  # np.zeros(shape=(self.reservoir_size + 1, self.n_outputs_))
         return input_weights_init, reservoir_weights_init, bias_weights_init, output_weights_init
 
+    def _sample_connections(self, n_nodes, n_inputs, k):
+        """
+        Draw k distinct inputs for every reservoir node. The random matrix the indices are selected from is drawn in
+        blocks of nodes, so that it never exceeds about 1e6 entries.
+
+        Parameters
+        ----------
+        n_nodes : int
+            The number of nodes, e.g. the number of rows of the weight matrix
+        n_inputs : int
+            The number of inputs per node, e.g. the number of columns of the weight matrix
+        k : int
+            The number of connections of every node
+
+        Returns
+        -------
+        rows : ndarray of shape (n_nodes * k, )
+            The row indices of the connections
+        cols : ndarray of shape (n_nodes * k, )
+            The column indices of the connections
+        """
+        rows = np.repeat(np.arange(n_nodes, dtype=np.int32), k)
+        cols = np.empty(n_nodes * k, dtype=np.int32)
+        block_size = max(1, 1000000 // n_inputs)
+        for start in range(0, n_nodes, block_size):
+            stop = min(start + block_size, n_nodes)
+            per = np.argpartition(self._random_state.rand(stop - start, n_inputs), k - 1, axis=1)
+            cols[start * k:stop * k] = per[:, :k].ravel()
+        return rows, cols
+
+    def _init_reservoir_weights(self):
+        """
+        Initialize the recurrent weights inside the reservoir, drawn from a standard normal distribution and normalized
+        to a unitary spectral radius.
+
+        Returns
+        -------
+        reservoir_weights_init : ndarray or sparse matrix of shape (reservoir_size, reservoir_size)
+            The normalized recurrent weights
+        """
+        if self.k_res == -1:
+            reservoir_weights_init = self._random_state.randn(self.reservoir_size, self.reservoir_size)
+        else:
+            k_res = min(self.k_res, self.reservoir_size)
+            nr_entries = np.int32(self.reservoir_size * k_res)
+            data_vec = self._random_state.randn(nr_entries)
+            rows, cols = self._sample_connections(self.reservoir_size, self.reservoir_size, k_res)
+            reservoir_weights_init = scipy.sparse.csr_matrix(
+                (data_vec, (rows, cols)), shape=(self.reservoir_size, self.reservoir_size), dtype='float64')
+        # Recurrent weights are normalized to a unitary spectral radius.
+        try:
+            # Several eigenvalues and a larger Krylov subspace than the default are computed, because the dominant
+            # eigenvalues of random reservoirs are close in magnitude, and ARPACK often returned a smaller one with k=1.
+            # The starting vector is drawn from random_state, so that the result is reproducible.
+            we = eigens(reservoir_weights_init, return_eigenvectors=False, k=6, which='LM',
+                        ncv=min(40, self.reservoir_size), v0=self._random_state.randn(self.reservoir_size))
+            max_abs_eigenvalue = np.amax(np.absolute(we))
+        except ArpackNoConvergence as e:
+            if e.eigenvalues.size > 0:
+                max_abs_eigenvalue = np.amax(np.absolute(e.eigenvalues))
+            else:
+                # Instead of drawing new weights until ARPACK converges, estimate the spectral radius of these.
+                print("WARNING: No convergence! Estimating the spectral radius with power iteration...")
+                max_abs_eigenvalue = self._estimate_spectral_radius(reservoir_weights_init)
+
+        if max_abs_eigenvalue > 0.:
+            reservoir_weights_init *= (1. / max_abs_eigenvalue)
+        else:
+            print("WARNING: The spectral radius of the reservoir weights is zero! They are left unscaled.")
+        return reservoir_weights_init
+
+    def _estimate_spectral_radius(self, reservoir_weights, n_iterations=1000):
+        """
+        Estimate the spectral radius of the reservoir weights with power iteration. The growth of the iterated vector
+        is averaged over the second half of the iterations, because the dominant eigenvalues of random reservoir
+        matrices are usually complex or close in magnitude, which lets the growth of single iterations oscillate.
+        For sparse random reservoirs, the estimate is within about 0.1% of the spectral radius with 1000 iterations,
+        while it can be more than 1% off with 100 iterations.
+
+        Parameters
+        ----------
+        reservoir_weights : ndarray or sparse matrix of shape (reservoir_size, reservoir_size)
+            The recurrent weights inside the reservoir
+        n_iterations : int, default 1000
+            The number of matrix-vector products
+
+        Returns
+        -------
+        spectral_radius : float
+            The estimated spectral radius
+        """
+        v = self._random_state.randn(self.reservoir_size)
+        v /= np.linalg.norm(v)
+        log_growth = 0.
+        for n in range(n_iterations):
+            v = reservoir_weights.dot(v)
+            norm = np.linalg.norm(v)
+            if norm == 0.:
+                return 0.
+            v /= norm
+            if n >= n_iterations // 2:
+                log_growth += np.log(norm)
+        return np.exp(log_growth / (n_iterations - n_iterations // 2))
+
     def _fit(self, X, y, incremental=False, update_output_weights=True, n_jobs=0):
         """
         Fit the model to the data matrix X and target(s) y.
@@ -350,11 +424,17 @@ class BaseEchoStateNetwork(BaseEstimator):
         reservoir_state : ndarray of shape (n_samples, reservoir_size)
             The collected reservoir states
         """
-        reservoir_state = self._forward_pass(reservoir_inputs=X)
+        # The states are written directly into one array with a leading constant column instead of concatenating them.
+        if self.bi_directional:
+            reservoir_state = np.empty(shape=(X.shape[0], 2 * self.reservoir_size + 1))
+        else:
+            reservoir_state = np.empty(shape=(X.shape[0], self.reservoir_size + 1))
+        reservoir_state[:, 0] = 1.
+        self._forward_pass(reservoir_inputs=X, reservoir_state=reservoir_state[:, 1:self.reservoir_size + 1])
         if self.bi_directional:
-            reservoir_state = \
-                np.concatenate((reservoir_state, np.flipud(self._forward_pass(reservoir_inputs=np.flipud(X)))), 1)
-        reservoir_state = np.concatenate((np.ones((reservoir_state.shape[0], 1)), reservoir_state), 1)
+            # The backward pass writes through a reversed view, so that its states are stored in the original order.
+            self._forward_pass(reservoir_inputs=np.flipud(X),
+                               reservoir_state=reservoir_state[::-1, self.reservoir_size + 1:])
         return reservoir_state
 
     def _fit_offline(self, X, y, incremental=False, update_output_weights=True, n_jobs: int = 0):
@@ -420,7 +500,7 @@ class BaseEchoStateNetwork(BaseEstimator):
             self._xTx = None
             self._xTy = None
 
-    def _forward_pass(self, reservoir_inputs):
+    def _forward_pass(self, reservoir_inputs, reservoir_state=None):
         """
         Perform a forward pass on the network by computing the values
         of the neurons in the hidden layers and the output layer.
@@ -429,44 +509,59 @@ class BaseEchoStateNetwork(BaseEstimator):
         ----------
         reservoir_inputs : ndarray of shape (n_samples, n_features)
             The input data
+        reservoir_state : ndarray of shape (n_samples, reservoir_size), default None
+            If given, the reservoir states are written into this array instead of a newly allocated one.
 
         Returns
         -------
-
+        reservoir_state : ndarray of shape (n_samples, reservoir_size)
+            The collected reservoir states
         """
         n_samples, n_features = reservoir_inputs.shape
-        reservoir_state = np.zeros(shape=(n_samples+1, self.reservoir_size))
+        if reservoir_state is None:
+            reservoir_state = np.empty(shape=(n_samples, self.reservoir_size))
+        previous_state = np.zeros(shape=(self.reservoir_size,))
+        # The input does not depend on the reservoir state. Thus, it is passed through the input weights for all samples
+        # in one product instead of one sparse matrix-vector product per time step. The input scaling is folded into
+        # the weights, which have far fewer entries than the input activations.
+        input_weights = self.input_weights_ * self.input_scaling
         if self.ext_bias > 0:
-            for sample in range(n_samples):
-                if scipy.sparse.issparse(self.input_weights_):
-                    a = self.input_weights_ * reservoir_inputs[sample, :-self.ext_bias] * self.input_scaling
-                else:
-                    a = np.dot(self.input_weights_, self.input_scaling * reservoir_inputs[sample, :-self.ext_bias])
-                if scipy.sparse.issparse(self.reservoir_weights_):
-                    b = self.reservoir_weights_ * reservoir_state[sample, :] * self.spectral_radius
-                else:
-                    b = np.dot(self.reservoir_weights_, self.spectral_radius * reservoir_state[sample, :])
-
-                reservoir_state[sample + 1, :] = ACTIVATIONS[self.reservoir_activation](
-                    np.atleast_2d(a + b).T + self.bias_weights_ * self.bias * reservoir_inputs[sample, -self.ext_bias]).flatten()
-                reservoir_state[sample + 1, :] = (1 - self.leakage) * reservoir_state[sample, :]\
-                                                 + self.leakage * reservoir_state[sample + 1, :]
+            input_activations = safe_sparse_dot(reservoir_inputs[:, :-self.ext_bias], input_weights.T)
+            # The external bias inputs are weighted like the other inputs, so they are added for all samples at once.
+            if self.bias != 0.:
+                input_activations += np.dot(reservoir_inputs[:, -self.ext_bias:], self.bias_weights_.T) * self.bias
+        else:
+            input_activations = safe_sparse_dot(reservoir_inputs, input_weights.T)
+            # The bias is the same for all samples and is skipped entirely if it is switched off.
+            if self.bias != 0.:
+                input_activations += self.bias_weights_*self.bias
+        # The reservoir weights are fixed during the pass. Scale them once instead of every reservoir state.
+        if self.spectral_radius == 0.:
+            reservoir_weights = None
         else:
-            for sample in range(n_samples):
-                if scipy.sparse.issparse(self.input_weights_):
-                    a = self.input_weights_ * reservoir_inputs[sample, :] * self.input_scaling
-                else:
-                    a = np.dot(self.input_weights_, self.input_scaling * reservoir_inputs[sample, :])
-                if scipy.sparse.issparse(self.reservoir_weights_):
-                    b = self.reservoir_weights_ * reservoir_state[sample, :] * self.spectral_radius
-                else:
-                    b = np.dot(self.reservoir_weights_, self.spectral_radius * reservoir_state[sample, :])
-
-                reservoir_state[sample+1, :] = \
-                    ACTIVATIONS[self.reservoir_activation](a + b + self.bias_weights_*self.bias)
-                reservoir_state[sample+1, :] = \
-                    (1 - self.leakage) * reservoir_state[sample, :] + self.leakage * reservoir_state[sample+1, :]
-        return reservoir_state[1:, :]
+            if self.reservoir_weights_ is None:
+                raise NotFittedError("This %s instance was initialized with spectral_radius=0 and has no reservoir "
+                                     "weights. Call 'fit' again after setting spectral_radius > 0."
+                                     % type(self).__name__)
+            reservoir_weights = self.reservoir_weights_ * self.spectral_radius
+        # Resolve the activation function once instead of at every time step.
+        activation = ACTIVATIONS[self.reservoir_activation]
+        for sample in range(n_samples):
+            a = input_activations[sample, :]
+            if reservoir_weights is None:
+                b = 0.
+            elif scipy.sparse.issparse(reservoir_weights):
+                b = reservoir_weights * previous_state
+            else:
+                b = np.dot(reservoir_weights, previous_state)
+
+            # The activation is computed in place in the output row instead of on temporary arrays.
+            np.add(a, b, out=reservoir_state[sample, :])
+            activation(reservoir_state[sample, :])
+            reservoir_state[sample, :] = \
+                (1 - self.leakage) * previous_state + self.leakage * reservoir_state[sample, :]
+            previous_state = reservoir_state[sample, :]
+        return reservoir_state
 
     def partial_fit(self, X, y, update_output_weights=True, n_jobs=0):
         """
@@ -561,11 +656,12 @@ class BaseEchoStateNetwork(BaseEstimator):
             new_reservoir_size = int(drop_out_rate * self.reservoir_size)
             idx_to_drop_ = np.argsort(self._activations_var)[::-1][int(drop_out_rate * self.reservoir_size):]
             self.bias_weights_ = np.delete(self.bias_weights_, idx_to_drop_)
-            self.input_weights_ = scipy.sparse.csc_matrix(
+            self.input_weights_ = scipy.sparse.csr_matrix(
                 np.delete(self.input_weights_.toarray(), idx_to_drop_, axis=0), dtype='float64')
-            self.reservoir_weights_ = scipy.sparse.csc_matrix(
-                np.delete(np.delete(self.reservoir_weights_.toarray(), idx_to_drop_, axis=0), idx_to_drop_, axis=1),
-                dtype='float64')
+            if self.reservoir_weights_ is not None:
+                self.reservoir_weights_ = scipy.sparse.csr_matrix(
+                    np.delete(np.delete(self.reservoir_weights_.toarray(), idx_to_drop_, axis=0), idx_to_drop_, axis=1),
+                    dtype='float64')
 
             self._n_samples = 0
 
@@ -625,6 +721,20 @@ class BaseEchoStateNetwork(BaseEstimator):
         else:
             self.output_weights_ = np.dot(inv_xTx, self._xTy)
 
+    def _check_is_fitted(self):
+        """
+        Check that the model has been trained.
+
+        Returns
+        -------
+
+        """
+        check_is_fitted(self, ['input_weights_', 'reservoir_weights_', 'bias_weights_', 'output_weights_'])
+        if not self.output_weights_.any():
+            msg = ("This %(name)s instance is not fitted yet. Call 'fit' with "
+                   "appropriate arguments before using this method.")
+            raise NotFittedError(msg % {'name': type(self).__name__})
+
     def predict(self, X, keep_reservoir_state=False):
         """
         Predict using the trained ESN model
@@ -640,11 +750,7 @@ class BaseEchoStateNetwork(BaseEstimator):
         y_pred : array-like, shape (n_samples,) or (n_samples, n_outputs)
             The predicted values
         """
-        check_is_fitted(self, ['input_weights_', 'reservoir_weights_', 'bias_weights_', 'output_weights_'])
-        if not self.output_weights_.any():
-            msg = ("This %(name)s instance is not fitted yet. Call 'fit' with "
-                   "appropriate arguments before using this method.")
-            raise NotFittedError(msg % {'name': type(self).__name__})
+        self._check_is_fitted()
         X = check_array(X, accept_sparse=False)
         y_pred = self._predict(X=X, keep_reservoir_state=keep_reservoir_state)
         return y_pred
@@ -734,7 +840,10 @@ class ESNClassifier(BaseEchoStateNetwork, ClassifierMixin):
 
     Attributes
     ----------
-    TODO
+    reservoir_weights_ : ndarray or sparse matrix of shape (reservoir_size, reservoir_size) or None
+        The recurrent weights inside the reservoir, normalized to a unitary spectral radius. If the model was
+        initialized with spectral_radius=0.0 (the default), there are no recurrent connections and this is None. Thus,
+        the model needs to be fitted again after increasing spectral_radius with set_params.
 
     Notes
     -----
@@ -823,11 +932,6 @@ class ESNClassifier(BaseEchoStateNetwork, ClassifierMixin):
         y_pred : array-like, shape (n_samples,) or (n_samples, n_outputs)
             The predicted classes
         """
-        check_is_fitted(self, ['input_weights_', 'reservoir_weights_', 'bias_weights_', 'output_weights_'])
-        if self.output_weights_.size == 0:
-            msg = ("This %(name)s instance is not fitted yet. Call 'fit' with "
-                   "appropriate arguments before using this method.")
-            raise NotFittedError(msg % {'name': type(self).__name__})
         y_pred = super().predict(X, keep_reservoir_state=keep_reservoir_state)
 
         if self.n_outputs_ == 1:
@@ -1003,7 +1107,10 @@ class ESNRegressor(BaseEchoStateNetwork, RegressorMixin):
 
     Attributes
     ----------
-    TODO
+    reservoir_weights_ : ndarray or sparse matrix of shape (reservoir_size, reservoir_size) or None
+        The recurrent weights inside the reservoir, normalized to a unitary spectral radius. If the model was
+        initialized with spectral_radius=0.0 (the default), there are no recurrent connections and this is None. Thus,
+        the model needs to be fitted again after increasing spectral_radius with set_params.
 
     Notes
     -----
@@ -180,29 +180,52 @@ class BaseExtremeLearningMachine(BaseEstimator):
         -------
         """
         # Input-to-node weights, drawn from uniform distribution.
-        idx_co = 0
-
         if self.k_in == -1:
             self.k_in = n_features
 
-        nr_entries = np.int32(self.hidden_layer_size*self.k_in)
-        ij = np.zeros((2, nr_entries), dtype=int)
-        data_vec = self._random_state.rand(nr_entries) * 2 - 1
-        for en in range(self.hidden_layer_size):
-            per = self._random_state.permutation(n_features)[:self.k_in]
-            ij[0][idx_co:idx_co+self.k_in] = en
-            ij[1][idx_co:idx_co+self.k_in] = per
-            idx_co = idx_co + self.k_in
-        input_weights_init = scipy.sparse.csc_matrix((data_vec, ij),
+        # A node cannot be connected to more distinct features than there are, e.g. for a single input feature.
+        k_in = min(self.k_in, n_features)
+        nr_entries = np.int32(self.hidden_layer_size*k_in)
+        data_vec = self._random_state.uniform(-1., 1., nr_entries)
+        rows, cols = self._sample_connections(self.hidden_layer_size, n_features, k_in)
+        input_weights_init = scipy.sparse.csr_matrix((data_vec, (rows, cols)),
                                                      shape=(self.hidden_layer_size, n_features), dtype='float64')
         # Bias weights, fully connected bias for the hidden layer nodes, drawn from uniform distribution.
         # TODO: Optionally set bias weights to zero (GBH Paper)
-        bias_weights_init = (self._random_state.rand(self.hidden_layer_size) * 2 - 1)
+        bias_weights_init = self._random_state.uniform(-1., 1., self.hidden_layer_size)
         # Feedback weights, fully connected feedback from the output to the hidden layer nodes
         # drawn from uniform distribution.
         output_weights_init = None  # np.zeros(shape=(self.hidden_layer_size + 1, self.n_outputs_))
         return input_weights_init, bias_weights_init, output_weights_init
 
+    def _sample_connections(self, n_nodes, n_inputs, k):
+        """
+        Draw k distinct inputs for every hidden node. The random matrix the indices are selected from is drawn in
+        blocks of nodes, so that it never exceeds about 1e6 entries.
+        Parameters
+        ----------
+        n_nodes : int
+            The number of nodes, e.g. the number of rows of the weight matrix
+        n_inputs : int
+            The number of inputs per node, e.g. the number of columns of the weight matrix
+        k : int
+            The number of connections of every node
+        Returns
+        -------
+        rows : ndarray of shape (n_nodes * k, )
+            The row indices of the connections
+        cols : ndarray of shape (n_nodes * k, )
+            The column indices of the connections
+        """
+        rows = np.repeat(np.arange(n_nodes, dtype=np.int32), k)
+        cols = np.empty(n_nodes * k, dtype=np.int32)
+        block_size = max(1, 1000000 // n_inputs)
+        for start in range(0, n_nodes, block_size):
+            stop = min(start + block_size, n_nodes)
+            per = np.argpartition(self._random_state.rand(stop - start, n_inputs), k - 1, axis=1)
+            cols[start * k:stop * k] = per[:, :k].ravel()
+        return rows, cols
+
     def _fit(self, X, y, incremental=False, update_output_weights=True, n_jobs=0):
         """
         Fit the model to the data matrix X and target(s) y.
@@ -321,22 +344,17 @@ class BaseExtremeLearningMachine(BaseEstimator):
         Returns
         -------
         """
-        n_samples, n_features = elm_inputs.shape
-        hidden_layer_state = np.zeros(shape=(n_samples+1, self.hidden_layer_size))
-        for sample in range(n_samples):
-            if scipy.sparse.issparse(self.input_weights_):
-                a = self.input_weights_ * elm_inputs[sample, :] * self.input_scaling
-            else:
-                a = np.dot(self.input_weights_, elm_inputs[sample, :] * self.input_scaling)  # Changed , to *
-
-            # no bounded_relu support
-            # https://github.com/scikit-learn/scikit-learn/blob/0fb307bf39bbdacd6ed713c00724f8f871d60370/sklearn/neural_network/_base.py
-            hidden_layer_state[sample+1, :] = ACTIVATIONS[self.activation_function](a + self.bias_weights_*self.bias)
-        """This should be the same: 
-        hidden_layer_state = ACTIVATIONS[self.activation_function](self.input_weights_ * elm_inputs * self.input_scaling + self.bias_weights_*self.bias)
+        # All samples are independent, so the input weights are applied to the whole batch in one sparse product.
+        # W.T of the CSR input weights is a CSC view that scipy evaluates without any format conversion.
+        # The input scaling is folded into the weights, which have far fewer entries than the hidden layer state.
+        hidden_layer_state = safe_sparse_dot(elm_inputs, (self.input_weights_ * self.input_scaling).T)
+        # Bias and activation are applied in place on the product, so that the output is allocated only once.
+        if self.bias != 0.:
+            hidden_layer_state += self.bias_weights_*self.bias
+        # no bounded_relu support
+        # https://github.com/scikit-learn/scikit-learn/blob/0fb307bf39bbdacd6ed713c00724f8f871d60370/sklearn/neural_network/_base.py
+        ACTIVATIONS[self.activation_function](hidden_layer_state)
         return hidden_layer_state
-        """
-        return hidden_layer_state[1:, :]
 
     def partial_fit(self, X, y, update_output_weights=True, n_jobs=0):
         """
@@ -433,6 +451,18 @@ class BaseExtremeLearningMachine(BaseEstimator):
         else:
             self.output_weights_ = np.dot(inv_xTx, self._xTy)
 
+    def _check_is_fitted(self):
+        """
+        Check that the model has been trained.
+        Returns
+        -------
+        """
+        check_is_fitted(self, ['input_weights_', 'bias_weights_', 'output_weights_'])  # , 'recurrent_weights_'
+        if not self.output_weights_.any():
+            msg = ("This %(name)s instance is not fitted yet. Call 'fit' with "
+                   "appropriate arguments before using this method.")
+            raise NotFittedError(msg % {'name': type(self).__name__})
+
     def predict(self, X, keep_hidden_layer_state=False):
         """
         Predict using the trained ELM model
@@ -447,11 +477,7 @@ class BaseExtremeLearningMachine(BaseEstimator):
         y_pred : array-like, shape (n_samples,) or (n_samples, n_outputs)
             The predicted values
         """
-        check_is_fitted(self, ['input_weights_', 'bias_weights_', 'output_weights_'])  # , 'recurrent_weights_'
-        if not self.output_weights_.any():
-            msg = ("This %(name)s instance is not fitted yet. Call 'fit' with "
-                   "appropriate arguments before using this method.")
-            raise NotFittedError(msg % {'name': type(self).__name__})
+        self._check_is_fitted()
         X = check_array(X, accept_sparse=False)
         y_pred = self._predict(X=X, keep_hidden_layer_state=keep_hidden_layer_state)
         return y_pred
@@ -591,11 +617,6 @@ class ELMClassifier(BaseExtremeLearningMachine, ClassifierMixin):
         y_pred : array-like, shape (n_samples,) or (n_samples, n_outputs)
             The predicted classes
         """
-        check_is_fitted(self, ['input_weights_', 'bias_weights_', 'output_weights_'])  # , 'recurrent_weights_'
-        if self.output_weights_.size == 0:
-            msg = ("This %(name)s instance is not fitted yet. Call 'fit' with "
-                   "appropriate arguments before using this method.")
-            raise NotFittedError(msg % {'name': type(self).__name__})
         y_pred = super().predict(X, keep_hidden_layer_state=keep_hidden_layer_state)
 
         if self.n_outputs_ == 1:
@@ -0,0 +1,28 @@
+import numpy as np
+
+from pyrcn.echo_state_network import ESNRegressor
+from pyrcn.extreme_learning_machine import ELMRegressor
+
+
+def test_esn_single_feature():
+    X = np.random.RandomState(0).randn(100, 1)
+    y = X[:, 0]
+    esn = ESNRegressor(reservoir_size=50, random_state=0).fit(X, y)
+    assert esn.input_weights_.shape == (50, 1)
+    assert esn.predict(X).shape == (100, )
+
+
+def test_esn_single_feature_ext_bias():
+    X = np.hstack((np.random.RandomState(0).randn(100, 1), np.ones(shape=(100, 1))))
+    y = X[:, 0]
+    esn = ESNRegressor(reservoir_size=50, ext_bias=1, bias=1., random_state=0).fit(X, y)
+    assert esn.input_weights_.shape == (50, 1)
+    assert esn.predict(X).shape == (100, )
+
+
+def test_elm_single_feature():
+    X = np.random.RandomState(0).randn(100, 1)
+    y = X[:, 0]
+    elm = ELMRegressor(k_in=2, hidden_layer_size=50, random_state=0).fit(X, y)
+    assert elm.input_weights_.shape == (50, 1)
+    assert elm.predict(X).shape == (100, )